@@ -526,6 +526,286 @@ class Manager:
                     print(name+" has been successfully installed.")
         else: print(name+" is already installed.")
 
+    def read_manifest(self, name):
+        if not os.path.isfile("./Mods/"+name+"/manifest.json"): return None
+
+        with open("./Mods/"+name+"/manifest.json", "r") as file:
+            try:
+                return json.load(file)
+            except:
+                try:
+                    file.seek(3) # Avoid gunk at start of file
+                    return json.load(file)
+                except:
+                    return None
+
+    def is_installed(self, name):
+        plugins = self.gamePath+"/BepInEx/plugins"
+        if not os.path.isdir(plugins): return False
+
+        # Mods with a plugins folder are merged into BepInEx instead of getting their own folder
+        if os.path.isdir("./Mods/"+name+"/plugins"):
+            for i in os.listdir("./Mods/"+name+"/plugins"):
+                if os.path.exists(plugins+"/"+i):
+                    return True
+            return False
+
+        return os.path.isdir(plugins+"/"+name)
+
+    def profile_mods(self, profiles):
+        # Returns the mod names used by modProfiles, or None if the shape isn't recognised
+        # Accepts {"name": profile} or [profile], where a profile is a mod, a list of mods
+        # or {"mods": [...]}, and a mod is a name or a thunderstore url
+
+        if isinstance(profiles, dict):
+            profiles = list(profiles.values())
+        if not isinstance(profiles, list): return None
+
+        mods = []
+        for profile in profiles:
+            if isinstance(profile, dict):
+                profile = profile.get("mods")
+            if isinstance(profile, str):
+                profile = [profile]
+            if not isinstance(profile, list): return None
+
+            for mod in profile:
+                if not isinstance(mod, str): return None
+                if "/package/" in mod:
+                    mod = mod.split("/package/")[1].split("/")[1]
+                mods.append(mod)
+
+        return mods
+
+    def save_config(self, key, value):
+        id = self.configs.GetId()
+        dc = self.configs.Read(waitforwrite=True, id=id)
+        dc[key] = value
+        self.configs.Write(dc, id=id)
+
+    def gc_snapshot(self, plugins, dc):
+        # Top level listings the garbage collection results depend on
+        return {"mods": sorted(os.listdir("./Mods")), "plugins": sorted(os.listdir(plugins)),
+                "profiles": dc.get("modProfiles", [])}
+
+    def find_garbage(self, budget=None):
+        '''
+        budget:
+            -- OPTIONAL --
+            type, float
+            default, None
+            Seconds to spend before pausing, None to run until done
+            Progress is saved to configs.json, calling again resumes it
+            Checked after every directory, so one huge directory can overrun it
+
+        Dry run of the garbage collection, nothing is deleted.
+        Marks every cached mod reachable from installed mods, R2API and
+        modProfiles through manifest dependencies, then finds unreachable
+        ./Mods entries and empty plugin folders no reachable mod owns.
+        Plugin folders with files that no cached mod owns were probably
+        installed by hand, they are listed in "kept" and never removed.
+        Pass the returned report to remove_garbage to delete its entries.
+        '''
+
+        deadline = None if budget == None else time.time() + budget
+        report = {"done": False, "error": None, "entries": [], "kept": [], "files": 0, "bytes": 0,
+                  "snapshot": None}
+
+        plugins = self.gamePath+"/BepInEx/plugins"
+        if not os.path.isdir(plugins):
+            # Without plugins nothing counts as installed, so every cached mod would look unused
+            report["error"] = "BepInEx/plugins does not exist, can't tell which mods are installed."
+            print("Skipping garbage collection, "+report["error"])
+            return report
+
+        dc = self.configs.Read()
+        profiles = self.profile_mods(dc.get("modProfiles", []))
+        if profiles == None:
+            report["error"] = "modProfiles in configs.json is in an unknown format."
+            print("Skipping garbage collection, "+report["error"])
+            return report
+
+        # Start over if anything changed since the saved progress
+        snapshot = self.gc_snapshot(plugins, dc)
+        state = dc.get("gcState")
+        if state == None or state["snapshot"] != snapshot:
+            state = {"snapshot": snapshot, "phase": "roots", "check": list(snapshot["mods"]),
+                     "queue": profiles + (["R2API"] if self.R2API != None else []),
+                     "marked": [], "owned": [], "scan": list(snapshot["plugins"]),
+                     "candidates": [], "measuring": None, "found": [], "kept": []}
+
+        # One item per step, at least one step per call
+        while state["phase"] != "done":
+            if state["phase"] == "roots": # Installed mods are roots
+                if len(state["check"]) == 0:
+                    state["phase"] = "mark"
+                    continue
+
+                mod = state["check"].pop()
+                if self.is_installed(mod):
+                    state["queue"].append(mod)
+
+            elif state["phase"] == "mark":
+                if len(state["queue"]) == 0:
+                    for mod in snapshot["mods"]:
+                        if not mod in state["marked"]:
+                            state["candidates"].append("./Mods/"+mod)
+                    state["phase"] = "scan"
+                    continue
+
+                mod = state["queue"].pop()
+                if mod in state["marked"] or mod == "BepInExPack": continue
+                state["marked"].append(mod)
+
+                # Same mapping as is_installed
+                if os.path.isdir("./Mods/"+mod+"/plugins"):
+                    state["owned"] += os.listdir("./Mods/"+mod+"/plugins")
+                else:
+                    state["owned"].append(mod)
+
+                mConfig = self.read_manifest(mod)
+                if mConfig != None:
+                    for dependency in mConfig.get("dependencies", []):
+                        state["queue"].append(dependency.split("-")[-2])
+
+            elif state["phase"] == "scan": # Plugin folders no reachable mod owns
+                if len(state["scan"]) == 0:
+                    state["phase"] = "measure"
+                    continue
+
+                i = state["scan"].pop()
+                if os.path.isdir(plugins+"/"+i) and not i in state["owned"]:
+                    state["candidates"].append(plugins+"/"+i)
+
+            elif state["phase"] == "measure": # One directory per step
+                current = state["measuring"]
+                if current == None:
+                    if len(state["candidates"]) == 0:
+                        state["phase"] = "done"
+                        continue
+
+                    path = state["candidates"].pop()
+                    current = {"path": path, "stack": [path], "files": 0, "bytes": 0}
+                    state["measuring"] = current
+
+                d = current["stack"].pop()
+                try:
+                    for i in os.listdir(d):
+                        if os.path.isdir(d+"/"+i) and not os.path.islink(d+"/"+i):
+                            current["stack"].append(d+"/"+i)
+                        else:
+                            current["bytes"] += os.path.getsize(d+"/"+i)
+                            current["files"] += 1
+                except OSError:
+                    pass
+
+                if len(current["stack"]) == 0:
+                    entry = {"path": current["path"], "files": current["files"], "bytes": current["bytes"]}
+                    if entry["path"].startswith(plugins) and entry["files"] > 0:
+                        state["kept"].append(entry)
+                    else:
+                        state["found"].append(entry)
+                    state["measuring"] = None
+
+            if deadline != None and time.time() >= deadline: break
+
+        if state["phase"] != "done":
+            self.save_config("gcState", state)
+            print("Garbage collection paused, it will continue next time.")
+            return report
+
+        self.save_config("gcState", None)
+
+        report["done"] = True
+        report["entries"] = state["found"]
+        report["kept"] = state["kept"]
+        report["snapshot"] = snapshot
+        for entry in state["found"]:
+            report["files"] += entry["files"]
+            report["bytes"] += entry["bytes"]
+            print("Would remove "+entry["path"])
+        for entry in state["kept"]:
+            print("Keeping "+entry["path"]+", it wasn't installed by RoR2M.")
+        print("Would free "+str(report["files"])+" files ("+str(report["bytes"])+" bytes).")
+
+        return report
+
+    def remove_garbage(self, report, budget=None):
+        '''
+        report:
+            type, dict
+            Report from find_garbage, its entries get deleted
+        budget:
+            -- OPTIONAL --
+            type, float
+            default, None
+            Seconds to spend before pausing, None to run until done
+            Checked after every directory, so one huge directory can overrun it
+            Unfinished removals are saved to configs.json as gcApproved
+
+        Nothing is removed if ./Mods, the plugins folder or modProfiles changed
+        since the report was made, find_garbage has to be run again.
+        Returns the entries that still need removing.
+        '''
+
+        deadline = None if budget == None else time.time() + budget
+        plugins = self.gamePath+"/BepInEx/plugins"
+
+        if not os.path.isdir(plugins) or self.gc_snapshot(plugins, self.configs.Read()) != report["snapshot"]:
+            print("Mods changed since the removal was approved, looking for unused mods again next time.")
+            self.save_config("gcApproved", None)
+            return []
+
+        report = json.loads(json.dumps(report)) # Don't change the caller's report
+        entries = report["entries"]
+        files = 0
+        size = 0
+
+        while len(entries) > 0:
+            entry = entries[0]
+            path = entry["path"]
+            paused = False
+
+            # Bottom up, one directory per step
+            try:
+                for root, dirs, fs in os.walk(path, topdown=False):
+                    for f in fs:
+                        os.remove(os.path.join(root, f))
+                    for d in dirs:
+                        if os.path.islink(os.path.join(root, d)): os.remove(os.path.join(root, d))
+                    os.rmdir(root)
+
+                    if deadline != None and time.time() >= deadline and os.path.isdir(path):
+                        paused = True
+                        break
+            except Exception as e:
+                print("Failed to remove "+path+", "+str(e))
+
+            if paused: break
+
+            del entries[0]
+            if not os.path.isdir(path):
+                print("Removed "+path)
+                files += entry["files"]
+                size += entry["bytes"]
+
+                # Keep the snapshot in line with our own removals
+                name = os.path.basename(path)
+                if path.startswith("./Mods/"):
+                    report["snapshot"]["mods"].remove(name)
+                else:
+                    report["snapshot"]["plugins"].remove(name)
+
+            if deadline != None and time.time() >= deadline: break
+
+        self.save_config("gcApproved", report if len(entries) > 0 else None)
+
+        print("Freed "+str(files)+" files ("+str(size)+" bytes).")
+        if len(entries) > 0:
+            print(str(len(entries))+" entries left to remove, they will be removed next time.")
+
+        return entries
+
     def launch_nw(self):
 
         #while True:
@@ -550,6 +830,24 @@ class Manager:
 
         self.check_for_updates_nw()
 
+        approved = self.configs.Read().get("gcApproved")
+        if approved != None:
+            print("\n\nRemoving unused mods...")
+            self.remove_garbage(approved, budget=2)
+        else:
+            print("\n\nLooking for unused mods...")
+            report = self.find_garbage(budget=2)
+            if report["done"] and len(report["entries"]) > 0:
+                # Only ask again once the unused mods are different from the ones the user kept
+                found = sorted([entry["path"] for entry in report["entries"]])
+                if found == self.configs.Read().get("gcDeclined"):
+                    print("Keeping unused mods, as chosen before.")
+                elif input("\n\nWould you like to remove these unused mods and plugin folders? (y/n) ")[0].lower() == "y":
+                    self.save_config("gcDeclined", None)
+                    self.remove_garbage(report, budget=2)
+                else:
+                    self.save_config("gcDeclined", found)
+
         if input("\n\nWould you like to install Kat's recommended mods?\nThese mods will have little affect on gameplay and are quality of life mods. (y/n) ")[0].lower() == "y":
             mods = ["https://thunderstore.io/package/Harb/DebugToolkit/", "https://thunderstore.io/package/JohnEdwa/RTAutoSprintEx/", "https://thunderstore.io/package/Lodington/Thiccify/", "https://thunderstore.io/package/DekuDesu/SkipWelcomeScreen/", "https://thunderstore.io/package/Kazzababe/SavedGames/", "https://thunderstore.io/package/xayfuu/EnemyHitLog/", "https://thunderstore.io/package/RyanPallesen/VanillaTweaks/", "https://thunderstore.io/package/Pickleses/TeleporterShow/", "https://thunderstore.io/package/mpawlowski/Compass/", "https://thunderstore.io/package/DekuDesu/MiniMapMod/", "https://thunderstore.io/package/SushiDev/DropinMultiplayer/", "https://thunderstore.io/package/pixeldesu/Pingprovements/", "https://thunderstore.io/package/IFixYourRoR2Mods/DiscordRichPresence/", "https://thunderstore.io/package/TheRealElysium/EmptyChestsBeGone/", "https://thunderstore.io/package/kookehs/StatsDisplay/"] # Broken "https://thunderstore.io/package/vis-eyth/UnmoddedClients/", "https://thunderstore.io/package/RyanPallesen/AssortedSkins/", https://thunderstore.io/package/felixire/BUT_IT_WAS_ME_DIO/
             for mod in mods: